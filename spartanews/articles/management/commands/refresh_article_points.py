@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from articles.models import (
+    ContentInfo,
+    comment_count_subquery,
+    like_count_subquery,
+    article_point_expression,
+)
+from articles.signals import expire_content_list_cache
+
+
+# 날짜가 하루 지날 때마다 -5 Point 는 요청 시점에 계산하지 않으므로
+# 주기적으로(cron 등으로 매시간) 실행해서 저장된 article_point 를 다시 계산함
+# ex) 0 * * * * python manage.py refresh_article_points
+class Command(BaseCommand):
+    help = "Recalculate stored comment_count, like_count and article_point of visible contents."
+
+    def handle(self, *args, **options):
+        rows = ContentInfo.objects.filter(is_visible=True)
+
+        # 뷰에서 F()로 증감한 값이 어긋났을 경우를 대비해 개수도 다시 셈
+        rows.update(
+            comment_count=comment_count_subquery(),
+            like_count=like_count_subquery(),
+        )
+        updated = rows.update(article_point=article_point_expression())
+        expire_content_list_cache()
+
+        self.stdout.write(f"{updated} contents refreshed.")
@@ -1,5 +1,7 @@
 from django.conf import settings
 from django.db import models
+from django.db.models import Count, F, Func, OuterRef, Q, Subquery, IntegerField
+from django.db.models.functions import Coalesce, Now
 
 
 class ContentInfo(models.Model):
@@ -24,6 +26,34 @@ class ContentInfo(models.Model):
     create_dt = models.DateTimeField(auto_now_add=True)
     update_dt = models.DateTimeField(auto_now=True)
 
+    # 목록 조회 때마다 계산하지 않도록 저장해두는 값 (비정규화)
+    # 댓글/좋아요 시 뷰에서 F()로 증감, 날짜 감점은 refresh_article_points 커맨드로 갱신
+    comment_count = models.IntegerField(default=0)
+    like_count = models.IntegerField(default=0)
+    article_point = models.IntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            # 목록 조회는 항상 is_visible=True 로 거른 뒤 정렬 (포인트순 / 최신순)
+            # -> is_visible=True 인 글만 담는 부분(partial) index
+            models.Index(
+                fields=["-article_point", "-create_dt", "-id"],
+                condition=Q(is_visible=True),
+                name="ci_vis_pt_idx",
+            ),
+            models.Index(
+                fields=["-create_dt", "-id"],
+                condition=Q(is_visible=True),
+                name="ci_vis_create_idx",
+            ),
+            # 특정 유저가 작성한 글 목록 (?user=)
+            models.Index(
+                fields=["userinfo", "-create_dt", "-id"],
+                condition=Q(is_visible=True),
+                name="ci_vis_user_idx",
+            ),
+        ]
+
 
 class CommentInfo(models.Model):
     userinfo = models.ForeignKey(
@@ -36,3 +66,65 @@ class CommentInfo(models.Model):
     is_visible = models.BooleanField(default=True)
     create_dt = models.DateTimeField(auto_now_add=True)
     update_dt = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # 글 하나의 댓글을 오래된 순으로 조회
+            models.Index(
+                fields=["contentinfo", "create_dt"],
+                condition=Q(is_visible=True),
+                name="cm_content_vis_idx",
+            ),
+            # 특정 유저가 작성한 댓글 목록 (?user=)
+            models.Index(
+                fields=["userinfo", "-create_dt"],
+                condition=Q(is_visible=True),
+                name="cm_user_vis_idx",
+            ),
+        ]
+
+
+# comment_count, like_count 를 JOIN + Count 로 같이 세면
+# 댓글 x 좋아요 만큼 row가 곱해져서 둘 다 부풀려진 값이 나옴
+# -> 각각 상관 서브쿼리로 따로 세서 붙임 (좋아요는 m2m 중간 테이블을 직접 셈)
+def count_subquery(rows, outer_field):
+    rows = rows.filter(**{outer_field: OuterRef("pk")}).order_by()
+    rows = rows.values(outer_field).annotate(c=Count("*")).values("c")
+    return Coalesce(Subquery(rows, output_field=IntegerField()), 0)
+
+
+def comment_count_subquery():
+    return count_subquery(CommentInfo.objects.filter(is_visible=True), "contentinfo_id")
+
+
+def like_count_subquery():
+    return count_subquery(ContentInfo.liked_by.through.objects.all(), "contentinfo_id")
+
+
+def comment_like_count_subquery():
+    return count_subquery(CommentInfo.liked_by.through.objects.all(), "commentinfo_id")
+
+
+# 작성 후 경과 일수 (현재 시각 - create_dt, 하루 단위 내림)
+# 현재 시각은 파이썬에서 넘기지 않고 DB의 Now()로 계산
+class AgeInDays(Func):
+    output_field = IntegerField()
+    arg_joiner = " - "
+    template = "FLOOR(EXTRACT(EPOCH FROM (%(expressions)s)) / 86400)::integer"
+
+    def __init__(self, expression, **extra):
+        super().__init__(Now(), expression, **extra)
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        # SQLite는 날짜를 문자열로 저장하므로 julianday()로 일 단위 실수로 변환
+        return self.as_sql(
+            compiler, connection,
+            arg_joiner=") - julianday(",
+            template="CAST(julianday(%(expressions)s) AS INTEGER)",
+            **extra_context
+        )
+
+
+# 포인트: 하루 지날 때마다 -5, 댓글 하나당 +3, 좋아요 하나당 +1
+def article_point_expression():
+    return -5 * AgeInDays(F("create_dt")) + 3 * F("comment_count") + F("like_count")
@@ -11,6 +11,9 @@ class ContentSerializer(serializers.ModelSerializer):
         read_only_fields = (
             "userinfo",
             "is_visible",
+            "comment_count",
+            "like_count",
+            "article_point",
         )
 
     def to_representation(self, instance):
@@ -26,9 +29,31 @@ class ContentAllSerializer(ContentSerializer):
     article_point = serializers.IntegerField()
 
 
+# 전체 리스트용: 글 내용 전체 대신 요약본(summary)만 내려줌
+class ContentListSerializer(serializers.ModelSerializer):
+    username = serializers.CharField(source="userinfo.username", read_only=True)
+    summary = serializers.CharField(read_only=True) # 뷰에서 annotate
+
+    class Meta:
+        model = ContentInfo
+        fields = (
+            "id",
+            "username",
+            "comment_count",
+            "like_count",
+            "article_point",
+            "title",
+            "summary",
+            "content_type",
+            "url",
+            "create_dt",
+            "update_dt",
+        )
+
+
 class CommentSerializer(serializers.ModelSerializer):
     username = serializers.CharField(source="userinfo.username", read_only=True)
-    likes = serializers.IntegerField(source="liked_by.count", read_only=True) # 역참조. 좋아요 수
+    likes = serializers.SerializerMethodField() # 역참조. 좋아요 수
 
     class Meta:
         model = CommentInfo
@@ -39,6 +64,12 @@ class CommentSerializer(serializers.ModelSerializer):
             "is_visible",
         )
 
+    def get_likes(self, instance):
+        # 목록 조회에서는 annotate 된 like_count 사용, 작성/수정 응답에서는 직접 셈
+        if hasattr(instance, "like_count"):
+            return instance.like_count
+        return instance.liked_by.count()
+
     def to_representation(self, instance):
         ret = super().to_representation(instance)
         ret.pop("userinfo")
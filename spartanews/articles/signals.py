@@ -0,0 +1,27 @@
+import time
+
+from django.core.cache import cache
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .models import ContentInfo
+
+
+# 전체 글 목록 캐시 버전
+# 캐시 키에 버전을 넣어두고, 글이 바뀌면 버전만 바꿔서 예전 캐시를 한 번에 무효화
+CONTENT_LIST_VERSION_KEY = "articles:list:version"
+
+
+def content_list_cache_version():
+    return cache.get_or_set(CONTENT_LIST_VERSION_KEY, time.time_ns(), None)
+
+
+def expire_content_list_cache():
+    cache.set(CONTENT_LIST_VERSION_KEY, time.time_ns(), None)
+
+
+# 글 작성/수정/삭제(soft delete) 시 목록 캐시 무효화
+# 좋아요/댓글 수는 update()로 바꾸므로 signal이 오지 않음 -> 캐시 만료 시간(60초) 동안은 이전 값
+@receiver(post_save, sender=ContentInfo)
+def content_saved(sender, **kwargs):
+    expire_content_list_cache()
@@ -1,3 +1,278 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models import QuerySet
+from django.test import TestCase, override_settings
+from rest_framework.pagination import CursorPagination
+from rest_framework.test import APIClient
+
+from .models import CommentInfo, ContentInfo
+
+
+class ContentListPaginationTests(TestCase):
+    # offset_cutoff(1000)보다 많은 글이 같은 article_point를 가질 때도
+    # 모든 글이 빠짐없이, 한 번씩만 나오는지 확인
+    row_count = CursorPagination.offset_cutoff + 300
+
+    @classmethod
+    def setUpTestData(cls):
+        user = get_user_model().objects.create_user(username="writer", password="password")
+        ContentInfo.objects.bulk_create(
+            ContentInfo(userinfo=user, title=f"title {i}", content="content", article_point=0)
+            for i in range(cls.row_count)
+        )
+        cls.ids = set(ContentInfo.objects.values_list("id", flat=True))
+
+    def setUp(self):
+        cache.clear()
+
+    def collect_ids(self, url):
+        client = APIClient()
+        seen = []
+        for _ in range(self.row_count):
+            response = client.get(url)
+            self.assertEqual(response.status_code, 200)
+            seen.extend(row["id"] for row in response.data["results"])
+            url = response.data["next"]
+            if url is None:
+                return seen
+        self.fail("pagination did not end")
+
+    def test_point_ordering_with_tied_points(self):
+        seen = self.collect_ids("/api/content/?page_size=100")
+        self.assertEqual(len(seen), len(set(seen)))
+        self.assertEqual(set(seen), self.ids)
+
+    def test_previous_link(self):
+        client = APIClient()
+        first = client.get("/api/content/?page_size=100").data
+        second = client.get(first["next"]).data
+        self.assertIsNone(first["previous"])
+        back = client.get(second["previous"]).data
+        self.assertEqual(
+            [row["id"] for row in back["results"]],
+            [row["id"] for row in first["results"]],
+        )
+
+    def test_invalid_cursor(self):
+        response = APIClient().get("/api/content/?cursor=not-a-cursor")
+        self.assertEqual(response.status_code, 404)
+
+    def test_new_ordering(self):
+        seen = self.collect_ids("/api/content/?order-by=new&page_size=100")
+        self.assertEqual(len(seen), len(set(seen)))
+        self.assertEqual(set(seen), self.ids)
+
+
+class ContentListCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        user = get_user_model().objects.create_user(username="writer", password="password")
+        ContentInfo.objects.bulk_create(
+            ContentInfo(userinfo=user, title=f"title {i}", content="content") for i in range(30)
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_equivalent_params_share_cache_entry(self):
+        client = APIClient()
+        client.get("/api/content/?page_size=20")
+        for url in (
+            "/api/content/?page_size=020",
+            "/api/content/?page_size=20&order-by=foo",
+            "/api/content/",
+        ):
+            with self.assertNumQueries(0):
+                response = client.get(url)
+            self.assertEqual(len(response.data["results"]), 20)
+
+    @override_settings(ALLOWED_HOSTS=["testserver", "other.example"])
+    def test_links_use_request_host(self):
+        client = APIClient()
+        client.get("/api/content/")
+        response = client.get("/api/content/", HTTP_HOST="other.example")
+        self.assertTrue(response.data["next"].startswith("http://other.example/"))
+
+
+class ToggleManyTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username="liker", password="password")
+        cls.content = ContentInfo.objects.create(userinfo=cls.user, title="title", content="content")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.Through = ContentInfo.liked_by.through
+
+    def test_concurrent_like_is_not_counted_twice(self):
+        # 목록을 읽은 뒤 bulk_create 전에 다른 요청(content_like)이 같은 좋아요를 먼저 넣은 상황
+        bulk_create = QuerySet.bulk_create
+
+        def insert_first(queryset, objs, *args, **kwargs):
+            self.Through.objects.create(userinfo=self.user, contentinfo=self.content)
+            return bulk_create(queryset, objs, *args, **kwargs)
+
+        with mock.patch.object(QuerySet, "bulk_create", autospec=True, side_effect=insert_first):
+            response = self.client.post("/api/content/like/", {"content_ids": [self.content.id]}, format="json")
+
+        self.assertEqual(response.status_code, 409)
+        self.content.refresh_from_db()
+        self.assertEqual(self.content.like_count, 0)
+        self.assertFalse(self.Through.objects.exists())
+
+    def test_concurrent_unlike_is_not_counted_twice(self):
+        # 목록을 읽은 뒤 delete 전에 다른 요청(content_like)이 같은 좋아요를 먼저 취소한 상황
+        self.client.post(f"/api/content/{self.content.id}/like/")
+        delete = QuerySet.delete
+
+        def delete_first(queryset):
+            delete(self.Through.objects.all())
+            return delete(queryset)
+
+        with mock.patch.object(QuerySet, "delete", autospec=True, side_effect=delete_first):
+            response = self.client.post("/api/content/like/", {"content_ids": [self.content.id]}, format="json")
+
+        self.assertEqual(response.status_code, 409)
+        self.content.refresh_from_db()
+        self.assertEqual(self.content.like_count, 1)
+        self.assertEqual(self.content.article_point, 1)
+
+    def test_id_array_body(self):
+        response = self.client.post("/api/content/like/", [self.content.id], format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["added"], [self.content.id])
+        self.content.refresh_from_db()
+        self.assertEqual(self.content.like_count, 1)
+
+    def test_invalid_body(self):
+        for body in ("1", {"content_ids": "1"}, {"content_ids": []}, ["1"], {}):
+            response = self.client.post("/api/content/like/", body, format="json")
+            self.assertEqual(response.status_code, 400, body)
+
+
+class ContentLikeTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username="liker", password="password")
+        cls.content = ContentInfo.objects.create(userinfo=cls.user, title="title", content="content")
+
+    def test_concurrent_unlike_is_not_counted_twice(self):
+        # get_or_create로 좋아요를 찾은 뒤 지우기 전에 다른 요청이 먼저 취소한 상황
+        client = APIClient()
+        client.force_authenticate(self.user)
+        client.post(f"/api/content/{self.content.id}/like/")
+        Through = ContentInfo.liked_by.through
+        delete = Through.delete
+
+        def delete_first(like):
+            Through.objects.filter(pk=like.pk).delete()
+            return delete(like)
+
+        with mock.patch.object(Through, "delete", autospec=True, side_effect=delete_first):
+            response = client.post(f"/api/content/{self.content.id}/like/")
+
+        # 취소한 쪽 요청이 -1 하므로 이 요청은 카운터를 건드리지 않음
+        self.assertEqual(response.status_code, 200)
+        self.content.refresh_from_db()
+        self.assertEqual(self.content.like_count, 1)
+        self.assertEqual(self.content.article_point, 1)
+
+
+class StoredCounterTests(TestCase):
+    # 댓글/좋아요 API가 ContentInfo에 저장된 comment_count, like_count, article_point를 맞게 바꾸는지 확인
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username="writer", password="password")
+        cls.content = ContentInfo.objects.create(userinfo=cls.user, title="title", content="content")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def assertCounters(self, comment_count, like_count, article_point):
+        self.content.refresh_from_db()
+        self.assertEqual(
+            (self.content.comment_count, self.content.like_count, self.content.article_point),
+            (comment_count, like_count, article_point),
+        )
+
+    def test_comment_create_and_delete(self):
+        response = self.client.post(f"/api/content/{self.content.id}/comment/", {"content": "comment"})
+        self.assertEqual(response.status_code, 201)
+        self.assertCounters(1, 0, 3)
+
+        comment_id = response.data["id"]
+        self.assertEqual(self.client.delete(f"/api/content/comment/{comment_id}/").status_code, 204)
+        self.assertCounters(0, 0, 0)
+
+        # 이미 삭제된 댓글을 다시 지워도 카운터는 그대로
+        self.assertEqual(self.client.delete(f"/api/content/comment/{comment_id}/").status_code, 204)
+        self.assertCounters(0, 0, 0)
+
+    def test_comment_on_missing_content(self):
+        response = self.client.post("/api/content/0/comment/", {"content": "comment"})
+        self.assertEqual(response.status_code, 404)
+
+    def test_like_and_unlike(self):
+        self.client.post(f"/api/content/{self.content.id}/like/")
+        self.assertCounters(0, 1, 1)
+        self.client.post(f"/api/content/{self.content.id}/like/")
+        self.assertCounters(0, 0, 0)
+
+    def test_bulk_like_and_unlike(self):
+        other = ContentInfo.objects.create(userinfo=self.user, title="other", content="content")
+        self.client.post(f"/api/content/{self.content.id}/like/")
+
+        response = self.client.post("/api/content/like/", {"content_ids": [self.content.id, other.id]}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["added"], [other.id])
+        self.assertEqual(response.data["removed"], [self.content.id])
+        self.assertCounters(0, 0, 0)
+        other.refresh_from_db()
+        self.assertEqual((other.like_count, other.article_point), (1, 1))
+
+
+class SoftDeleteTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.writer = User.objects.create_user(username="writer", password="password")
+        cls.other = User.objects.create_user(username="other", password="password")
+        cls.content = ContentInfo.objects.create(
+            userinfo=cls.writer, title="title", content="content", comment_count=1, article_point=3
+        )
+        cls.comment = CommentInfo.objects.create(userinfo=cls.writer, contentinfo=cls.content, content="comment")
+
+    def client_for(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client
+
+    def test_content_delete(self):
+        url = f"/api/content/{self.content.id}/"
+        self.assertEqual(self.client_for(self.writer).delete("/api/content/0/").status_code, 404)
+        self.assertEqual(self.client_for(self.other).delete(url).status_code, 403)
+        self.content.refresh_from_db()
+        self.assertTrue(self.content.is_visible)
+
+        self.assertEqual(self.client_for(self.writer).delete(url).status_code, 204)
+        self.content.refresh_from_db()
+        self.assertFalse(self.content.is_visible)
+
+    def test_comment_delete(self):
+        url = f"/api/content/comment/{self.comment.id}/"
+        self.assertEqual(self.client_for(self.writer).delete("/api/content/comment/0/").status_code, 404)
+        self.assertEqual(self.client_for(self.other).delete(url).status_code, 403)
+        self.comment.refresh_from_db()
+        self.assertTrue(self.comment.is_visible)
+        self.content.refresh_from_db()
+        self.assertEqual((self.content.comment_count, self.content.article_point), (1, 3))
+
+        self.assertEqual(self.client_for(self.writer).delete(url).status_code, 204)
+        self.comment.refresh_from_db()
+        self.assertFalse(self.comment.is_visible)
+        self.content.refresh_from_db()
+        self.assertEqual((self.content.comment_count, self.content.article_point), (0, 0))
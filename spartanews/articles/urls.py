@@ -7,8 +7,11 @@ urlpatterns = [
     path("<int:content_id>/", views.ContentDetailAPIView.as_view(), name="content_detail"),
     path("<int:content_id>/favorite/", views.content_favorite, name="content_favorite"),
     path("<int:content_id>/like/", views.content_like, name="content_like"),
+    path("favorite/", views.content_favorite_bulk, name="content_favorite_bulk"),
+    path("like/", views.content_like_bulk, name="content_like_bulk"),
     path("<int:content_id>/comment/", views.CommentListAPIView.as_view(), name="content_comments"),
     path("comment/", views.CommentListAPIView.as_view(), name="comment_list"),
     path("comment/<int:comment_id>/", views.CommentDetailAPIView.as_view(), name="comment_detail"),
     path("comment/<int:comment_id>/like/", views.comment_like, name="comment_like"),
+    path("comment/like/", views.comment_like_bulk, name="comment_like_bulk"),
 ]
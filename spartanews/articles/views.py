@@ -1,21 +1,24 @@
+# Python modules
+import json
+from base64 import b64decode, b64encode
+
 # Django modules
-from django.contrib.auth import get_user_model
-from django.db.models import (
-    F, Count, Func, ExpressionWrapper,
-    DateTimeField,
-    DurationField,
-    IntegerField,
-)
-from django.db.models.functions import Cast
+from django.core.cache import cache
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.db.models.functions import Left
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 
 # DRF modules
 from rest_framework import status, generics
-from rest_framework.decorators import api_view
-from rest_framework.exceptions import APIException
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import APIException, NotFound, ValidationError
+from rest_framework.pagination import BasePagination, PageNumberPagination
 from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly
 
@@ -23,9 +26,11 @@ from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnl
 from .serializers import (
     ContentSerializer,
     ContentAllSerializer,
+    ContentListSerializer,
     CommentSerializer,
 )
-from .models import ContentInfo, CommentInfo
+from .models import ContentInfo, CommentInfo, comment_like_count_subquery
+from .signals import content_list_cache_version, expire_content_list_cache
 
 
 # Custom API exception class when request with unavailable query params
@@ -34,101 +39,290 @@ class InvalidQueryParamsException(APIException): # exception 모델 상속 받
     default_detail = "Your request contain invalid query parameters."
 
 
-# Custom pagination class for articles list
-class ArticlesListPagination(PageNumberPagination): # 페이지네이션 커스텀
+class ToggleConflictException(APIException): # 여러 개 토글 중 다른 요청과 충돌
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "Some of the requested items were changed by another request. Please try again."
+
+
+# 숫자(id)여야 하는 쿼리 스트링 꺼내기
+# 없거나 빈 값이면 None, 숫자가 아니면 406
+def int_query_param(query_params, name):
+    value = query_params.get(name)
+    if not value:
+        return None
+    if not value.isdecimal():
+        raise InvalidQueryParamsException
+    return int(value)
+
+
+# Page number pagination without COUNT(*)
+# 전체 개수를 세지 않고 page_size + 1 개를 가져와서 다음 페이지가 있는지만 판단
+# 응답: {"next", "previous", "results"} ("count" 없음)
+class NoCountPageNumberPagination(PageNumberPagination):
+
+    def paginate_queryset(self, queryset, request, view=None):
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        self.request = request
+        try:
+            self.page_number = int(request.query_params.get(self.page_query_param, 1))
+        except ValueError:
+            self.page_number = 0
+        if self.page_number < 1:
+            raise NotFound(self.invalid_page_message)
+
+        offset = (self.page_number - 1) * page_size
+        rows = list(queryset[offset:offset + page_size + 1])
+        if not rows and self.page_number > 1:
+            raise NotFound(self.invalid_page_message)
+
+        self.has_next = len(rows) > page_size
+        return rows[:page_size]
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.page_query_param, self.page_number + 1)
+
+    def get_previous_link(self):
+        if self.page_number == 1:
+            return None
+        url = self.request.build_absolute_uri()
+        if self.page_number == 2:
+            return remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.page_query_param, self.page_number - 1)
+
+    def get_paginated_response(self, data):
+        return Response({
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data,
+        })
+
+
+# Keyset pagination for articles list
+# page 번호(OFFSET) 대신 마지막으로 본 글의 정렬 값(cursor) 다음부터 가져옴
+# -> 뒤 페이지로 갈수록 느려지지 않고, 매번 COUNT(*) 하지 않음
+# DRF CursorPagination은 정렬 첫 필드로만 위치를 잡아서 같은 값(포인트)이 많으면
+# OFFSET으로 넘어가고 offset_cutoff(1000)에서 끝없이 반복됨
+# -> 정렬 필드 전체를 cursor에 담고
+#    (a < x) OR (a = x AND b < y) OR (a = x AND b = y AND c < z) 조건으로 다음 페이지 조회
+# 응답: {"next", "previous", "results"}
+class KeysetPagination(BasePagination):
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Invalid cursor"
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    ordering = ("id",) # 모두 내림차순, 마지막 필드는 유일해야 함
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size < 1:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def decode_cursor(self, request, model):
+        # cursor -> (reverse, (정렬 필드 값, ...)). 없으면 None
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            reverse, *values = json.loads(b64decode(encoded.encode("ascii"), altchars=b"-_", validate=True))
+            if not isinstance(reverse, bool) or len(values) != len(self.ordering):
+                raise ValueError
+            values = tuple(
+                model._meta.get_field(name).to_python(value)
+                for name, value in zip(self.ordering, values)
+            )
+        except (TypeError, ValueError, DjangoValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        if any(value is None for value in values):
+            raise NotFound(self.invalid_cursor_message)
+        return reverse, values
+
+    def encode_cursor(self, reverse, values):
+        data = json.dumps([reverse, *(str(value) for value in values)])
+        return b64encode(data.encode(), altchars=b"-_").decode("ascii")
+
+    def keyset_filter(self, values, reverse):
+        lookup = "gt" if reverse else "lt"
+        condition = Q()
+        equal = {}
+        for name, value in zip(self.ordering, values):
+            condition |= Q(**equal, **{f"{name}__{lookup}": value})
+            equal[name] = value
+        # 첫 필드 범위 조건을 따로 걸어야 DB가 인덱스에서 그 위치부터 바로 찾아감 (OR만으로는 처음부터 훑음)
+        return Q(**{f"{self.ordering[0]}__{lookup}e": values[0]}) & condition
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size_value = self.get_page_size(request)
+        cursor = self.decode_cursor(request, queryset.model)
+
+        reverse = False
+        if cursor is not None:
+            reverse, values = cursor
+            queryset = queryset.filter(self.keyset_filter(values, reverse))
+        # 이전 페이지는 정렬을 뒤집어서 가져온 뒤 다시 뒤집음
+        direction = "" if reverse else "-"
+        queryset = queryset.order_by(*(direction + name for name in self.ordering))
+
+        rows = list(queryset[:self.page_size_value + 1])
+        has_more = len(rows) > self.page_size_value
+        rows = rows[:self.page_size_value]
+        if reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, cursor is not None
+        self.page = rows
+        return rows
+
+    def cursor_link(self, reverse, row):
+        values = [getattr(row, name) for name in self.ordering]
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(reverse, values))
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.cursor_link(False, self.page[-1])
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.request.build_absolute_uri(), self.cursor_query_param)
+        return self.cursor_link(True, self.page[0])
+
+    def get_paginated_response(self, data):
+        return Response({
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data,
+        })
+
+
+# Custom pagination class for articles list (포인트순)
+# 인덱스 ci_vis_pt_idx (-article_point, -create_dt, -id) 순서 그대로 조회
+class ArticlesPointPagination(KeysetPagination): # 페이지네이션 커스텀
     page_size = 20
     page_size_query_param = 'page_size' # 20에서 100 사이로
     max_page_size = 100
+    ordering = ("article_point", "create_dt", "id")
+
+
+# Custom pagination class for articles list (최신순, order-by=new)
+# 인덱스 ci_vis_create_idx (-create_dt, -id)
+class ArticlesNewPagination(ArticlesPointPagination):
+    ordering = ("create_dt", "id")
 
 
 # Custom pagination class for an article's comments list
-class CommentsListPagination(PageNumberPagination):
+class CommentsListPagination(NoCountPageNumberPagination):
     page_size = 50
     page_size_query_param = 'page_size'
     max_page_size = 50
 
 
 class ContentListAPIView(generics.ListAPIView):
-    serializer_class = ContentAllSerializer # serializers.py에서 상속
-    pagination_class = ArticlesListPagination # 페이지네이션 구현 custom pagination을 함
+    serializer_class = ContentListSerializer # serializers.py에서 상속
+    pagination_class = ArticlesPointPagination # 페이지네이션 구현 custom pagination을 함
     permission_classes = [IsAuthenticatedOrReadOnly] 
 
+    # 사용자 필터(user, liked-by, favorite-by) 없이 페이지/정렬만 있는 요청은 응답을 캐시
+    cacheable_params = {"cursor", "page_size", "order-by"}
+    cache_timeout = 60
+
+    @property
+    def paginator(self):
+        # 정렬 기준(order-by)에 맞는 cursor 필드로 페이지네이션
+        if not hasattr(self, "_paginator"):
+            if self.request.query_params.get("order-by") == "new":
+                self._paginator = ArticlesNewPagination()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
+
+    def list(self, request, *args, **kwargs):
+        query_params = request.query_params
+        if query_params.keys() - self.cacheable_params:
+            return super().list(request, *args, **kwargs)
+
+        # 같은 페이지를 가리키는 요청은 같은 key가 되도록 값을 정리해서 key로 사용
+        # (order-by=foo, page_size=020 처럼 문자열만 다른 요청마다 캐시가 쌓이지 않게)
+        # next/previous는 요청 host 기준 절대 URL이므로 scheme/host도 key에 포함
+        cursor = self.paginator.decode_cursor(request, ContentInfo) # 잘못된 cursor는 여기서 404
+        key = "articles:list:{}:{}:{}:{}:{}".format(
+            content_list_cache_version(),
+            request.build_absolute_uri("/"),
+            "new" if query_params.get("order-by") == "new" else "point",
+            self.paginator.encode_cursor(*cursor) if cursor else "",
+            self.paginator.get_page_size(request),
+        )
+        data = cache.get(key)
+        if data is None:
+            data = super().list(request, *args, **kwargs).data
+            cache.set(key, data, self.cache_timeout)
+        return Response(data)
+
     def get_queryset(self): #
         query_params = self.request.query_params # 쿼리 파라미터 담기
 
         # value of ordering query string
         order_by = query_params.get("order-by") # 꺼내기
 
-        # value of filtering query string
-        favorite_by = query_params.get("favorite-by") #UserInfo로
-        liked_by = query_params.get("liked-by") #UserInfo로
-        user = query_params.get("user")
+        # value of filtering query string (user id)
+        favorite_by = int_query_param(query_params, "favorite-by") #UserInfo로
+        liked_by = int_query_param(query_params, "liked-by") #UserInfo로
+        user = int_query_param(query_params, "user")
 
         # Filtering
 
         # check 'favorite_by' query string
-        # UserInfo.favorite_contents
-        if favorite_by:
-            if favorite_by.isdecimal():
-                rows = get_user_model().objects.get(pk=int(favorite_by)).favorite_contents.filter(is_visible=True) # 그 유저가 즐찾한 글을 모두 들고와서 거기에서 favorite 컨텐츠를 뽑고 존재(is_visible=True) 하는 걸 불러오기
-            else:
-                raise InvalidQueryParamsException
+        # ContentInfo.favorite_by
+        if favorite_by is not None:
+            rows = ContentInfo.objects.filter(favorite_by=favorite_by, is_visible=True) # 그 유저가 즐찾한 글 중 존재(is_visible=True) 하는 걸 불러오기. 유저 조회 없이 JOIN 한 번으로
         # check 'liked_by' query string
-        # UserInfo.liked_contents
-        elif liked_by:
-            if liked_by.isdecimal():
-                rows = get_user_model().objects.get(pk=int(liked_by)).liked_contents.filter(is_visible=True)
-            else:
-                raise InvalidQueryParamsException
+        # ContentInfo.liked_by
+        elif liked_by is not None:
+            rows = ContentInfo.objects.filter(liked_by=liked_by, is_visible=True)
         # check 'user' query string
         # ContentInfo
-        elif user:
-            if user.isdecimal():
-                rows = ContentInfo.objects.filter(is_visible=True, userinfo_id=int(user)) 
-            else:
-                raise InvalidQueryParamsException
+        elif user is not None:
+            rows = ContentInfo.objects.filter(is_visible=True, userinfo_id=user)
         # no query string
         # ContentInfo
         else:
             rows = ContentInfo.objects.filter(is_visible=True) # 모든 content를 불러옴
 
-        # annotate fields: 'comment_count', 'like_count', 'article_point'
-        # annotate but not include in serialized data: 'duration_in_microseconds', 'duration'
-        # duration_in_microseconds is divided by (1000 * 1000 * 60 * 60 * 24)
-        # because of converting microseconds to days
-
-        # duration Extract 사용은 duration... extract 는 장고의 기능임. duration_in_microseconds로 변환
-        rows = rows.annotate(
-            comment_count=Count(F("comments_on_content")), # 역참조 CommentInfo에서 역참조 매니저 명
-            like_count=Count(F("liked_by")), # 역참조 UserInfo에서 역참조 매니저명
-            duration_in_microseconds=ExpressionWrapper(
-                Cast(timezone.now().replace(microsecond=0), DateTimeField()) - F("create_dt"),
-                output_field=DurationField()
-            )
-        ).annotate(
-            duration=ExpressionWrapper(
-                Func(
-                    F('duration_in_microseconds') / (1000 * 1000 * 60 * 60 * 24),
-                    function='FLOOR',
-                    template="%(function)s(%(expressions)s)"
-                ), # microseconds -> days 로 변환 #Func(): 데이터베이스의 함수를 직접 작성해서 쓸 수 있게. 장고가 지원함.
-                output_field=IntegerField()
-            ) #// 여기까지는 SQLite의 한계로... 어쩔 수 없이 변환해서 씀
-        ).annotate(
-            article_point=ExpressionWrapper(
-                -5 * F("duration") + 3 * F("comment_count") + F("like_count"),
-                output_field=IntegerField()
-            )
-        ) # 시리얼라이저로 반환해서 정렬하기 어려우므로 필드 추가를 해서 반환. 시리얼라이저에서 할지 뷰에서 할지 방법 중 뷰에서 하는 걸로 선택한 것.
-        # annotate의 좋은 점: 데이터베이스에는 포함이 안 됨. 임시로 필드를 생성해서.
+        # 작성자 username을 JOIN으로 함께 불러옴 (row마다 UserInfo 조회하는 N+1 방지)
+        rows = rows.select_related("userinfo")
+
+        # 'comment_count', 'like_count', 'article_point' 는 ContentInfo에 저장된 값을 그대로 사용
+        # (매 요청마다 annotate로 계산해서 정렬하지 않음)
+
+        # 리스트에 필요한 컬럼만 SELECT. 글 내용 전체(content) 대신 앞부분만 잘라서 summary로
+        rows = rows.annotate(summary=Left("content", 100)).only(
+            "id", "title", "content_type", "url", "create_dt", "update_dt",
+            "comment_count", "like_count", "article_point", "userinfo__username",
+        )
 
         # Ordering
-        # order-by=new: ORDER BY create_dt DESC
-        # nothing: ORDER BY article_point DESC create_dt DESC
+        # order-by=new: ORDER BY create_dt DESC id DESC
+        # nothing: ORDER BY article_point DESC create_dt DESC id DESC
+        # (같은 값끼리 순서가 매번 같고 cursor 위치가 유일하도록 마지막에 id 추가)
         if order_by == "new":
-            rows = rows.order_by("-create_dt") # 최신순
+            rows = rows.order_by("-create_dt", "-id") # 최신순
         else:
-            rows = rows.order_by("-article_point", "-create_dt")
+            rows = rows.order_by("-article_point", "-create_dt", "-id")
 
         return rows # queryset return
 
@@ -147,46 +341,19 @@ class ContentDetailAPIView(generics.ListAPIView):
     permission_classes = [IsAuthenticatedOrReadOnly]
 
     def get_row(self, content_id):
-        return get_object_or_404(ContentInfo, pk=content_id)
+        # 수정 후 응답에 작성자 username이 필요하므로 같이 JOIN
+        return get_object_or_404(ContentInfo.objects.select_related("userinfo"), pk=content_id)
 
     def get_queryset(self):
-        row = ContentInfo.objects.filter(pk=self.kwargs.get("content_id"), is_visible=True)
-        if not row:
-            return ContentInfo.objects.none()
-
-        # annotate fields: 'comment_count', 'like_count', 'article_point'
-        # annotate but not include in serialized data: 'duration_in_microseconds', 'duration'
-        # duration_in_microseconds is divided by (1000 * 1000 * 60 * 60 * 24)
-        # because of converting microseconds to days
-        row = row.annotate(
-            comment_count=Count(F("comments_on_content")),
-            like_count=Count(F("liked_by")),
-            duration_in_microseconds=ExpressionWrapper(
-                Cast(timezone.now().replace(microsecond=0), DateTimeField()) - F("create_dt"),
-                output_field=DurationField()
-            )
-        ).annotate(
-            duration=ExpressionWrapper(
-                Func(
-                    F('duration_in_microseconds') / (1000 * 1000 * 60 * 60 * 24),
-                    function='FLOOR',
-                    template="%(function)s(%(expressions)s)"
-                ),
-                output_field=IntegerField()
-            )
-        ).annotate(
-            article_point=ExpressionWrapper(
-                -5 * F("duration") + 3 * F("comment_count") + F("like_count"),
-                output_field=IntegerField()
-            )
-        )
+        # 없거나 삭제된 글이면 빈 queryset -> 존재 확인용 쿼리를 따로 하지 않음
+        return ContentInfo.objects.filter(
+            pk=self.kwargs.get("content_id"), is_visible=True
+        ).select_related("userinfo")
 
-        return row
-    
     def put(self, request, content_id):
         row = self.get_row(content_id)
         # 로그인한 사용자와 글 작성자가 다를 경우 상태코드 403
-        if request.user.id != row.userinfo.id:
+        if request.user.id != row.userinfo_id:
             return Response(status=status.HTTP_403_FORBIDDEN)
 
         serializer = ContentSerializer(row, data=request.data, partial=True)
@@ -195,15 +362,21 @@ class ContentDetailAPIView(generics.ListAPIView):
             return Response(serializer.data)
 
     def delete(self, request, content_id):
-        row = self.get_row(content_id)
-        # 로그인한 사용자와 글 작성자가 다를 경우 상태코드 403
-        if request.user.id != row.userinfo.id:
-            return Response(status=status.HTTP_403_FORBIDDEN)
-
         # soft delete
         # 삭제된 글 추적을 위함
-        row.is_visible = False
-        row.save()
+        # 글을 불러오지 않고 작성자 조건을 건 UPDATE 한 번으로 처리
+        updated = ContentInfo.objects.filter(
+            pk=content_id, userinfo_id=request.user.id
+        ).update(is_visible=False, update_dt=timezone.now())
+
+        if not updated:
+            # 없는 글이면 404, 로그인한 사용자와 글 작성자가 다를 경우 상태코드 403
+            if not ContentInfo.objects.filter(pk=content_id).exists():
+                raise Http404("No ContentInfo matches the given query.")
+            return Response(status=status.HTTP_403_FORBIDDEN)
+
+        # update()는 post_save가 발생하지 않으므로 목록 캐시 직접 무효화
+        expire_content_list_cache()
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
@@ -220,41 +393,49 @@ class CommentListAPIView(generics.ListAPIView):
         if content_id: #content_id가 있으면
             rows = CommentInfo.objects.filter(contentinfo_id=content_id, is_visible=True) # 리스트에 담아서 주어야 해서 이렇게 함. QueryDict로
             # order by earliest
-            return rows.order_by("create_dt") # queryset으로 던지기 때문에 Response 안 씀
+            return self.with_related(rows).order_by("create_dt") # queryset으로 던지기 때문에 Response 안 씀
 
         # endpoint: /api/content/comment
-        liked_by = self.request.GET.get("liked-by")
-        user = self.request.GET.get("user")
+        query_params = self.request.query_params
+        liked_by = int_query_param(query_params, "liked-by")
+        user = int_query_param(query_params, "user")
         # check 'liked_by' query string
-        # UserInfo.liked_comments
-        if liked_by:
-            if liked_by.isdecimal():
-                rows = get_user_model().objects.get(pk=int(liked_by)).liked_comments.filter(is_visible=True)
-            else:
-                raise InvalidQueryParamsException
+        # CommentInfo.liked_by
+        if liked_by is not None:
+            rows = CommentInfo.objects.filter(liked_by=liked_by, is_visible=True)
         # check 'user' query string
         # CommentInfo
-        elif user:
-            if user.isdecimal():
-                rows = CommentInfo.objects.filter(is_visible=True, userinfo_id=int(user))
-            else:
-                raise InvalidQueryParamsException
+        elif user is not None:
+            rows = CommentInfo.objects.filter(is_visible=True, userinfo_id=user)
         # no query string
         # CommentInfo
         else:
             rows = CommentInfo.objects.filter(is_visible=True)
 
         # order by latest
-        return rows.order_by("-create_dt")
+        return self.with_related(rows).order_by("-create_dt")
+
+    def with_related(self, rows):
+        # 작성자 username은 JOIN, 좋아요 수는 서브쿼리로 같이 불러옴 (댓글마다 추가 쿼리 방지)
+        return rows.select_related("userinfo").annotate(like_count=comment_like_count_subquery())
 
     def post(self, request, content_id):
         serializer = CommentSerializer(data=request.data)
         if serializer.is_valid(raise_exception=True):
-            serializer.save(
-                userinfo=request.user,
-                contentinfo=ContentInfo.objects.get(pk=content_id),
-                is_visible=True
-            )
+            with transaction.atomic():
+                # 댓글 하나당 +3 Point
+                # 글을 불러오지 않고 UPDATE 결과로 글이 있는지 확인 (없으면 404)
+                updated = ContentInfo.objects.filter(pk=content_id).update(
+                    comment_count=F("comment_count") + 1,
+                    article_point=F("article_point") + 3,
+                )
+                if not updated:
+                    raise Http404("No ContentInfo matches the given query.")
+                serializer.save(
+                    userinfo=request.user,
+                    contentinfo_id=content_id,
+                    is_visible=True
+                )
             return Response(serializer.data, status=status.HTTP_201_CREATED)
 
 
@@ -262,12 +443,13 @@ class CommentDetailAPIView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get_row(self, comment_id):
-        return get_object_or_404(CommentInfo, pk=comment_id)
+        # 수정 후 응답에 작성자 username이 필요하므로 같이 JOIN
+        return get_object_or_404(CommentInfo.objects.select_related("userinfo"), pk=comment_id)
 
     def put(self, request, comment_id):
         row = self.get_row(comment_id)
         # 로그인한 사용자와 댓글 작성자가 다를 경우 상태코드 403
-        if request.user.id != row.userinfo.id:
+        if request.user.id != row.userinfo_id:
             return Response(status=status.HTTP_403_FORBIDDEN)
 
         serializer = CommentSerializer(row, data=request.data, partial=True)
@@ -276,98 +458,244 @@ class CommentDetailAPIView(APIView):
             return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
 
     def delete(self, request, comment_id):
-        row = self.get_row(comment_id)
-        # 로그인한 사용자와 댓글 작성자가 다를 경우 상태코드 403
-        if request.user.id != row.userinfo.id:
-            return Response(status=status.HTTP_403_FORBIDDEN)
-
         # soft delete
         # 삭제된 댓글 추적을 위함
-        row.is_visible = False
-        row.save()
+        # 댓글을 불러오지 않고 작성자 조건을 건 UPDATE 로 처리
+        with transaction.atomic():
+            updated = CommentInfo.objects.filter(
+                pk=comment_id, userinfo_id=request.user.id, is_visible=True
+            ).update(is_visible=False, update_dt=timezone.now())
+            if updated:
+                ContentInfo.objects.filter(comments_on_content=comment_id).update(
+                    comment_count=F("comment_count") - 1,
+                    article_point=F("article_point") - 3,
+                )
+
+        if not updated:
+            # 없는 댓글이면 404, 로그인한 사용자와 댓글 작성자가 다를 경우 상태코드 403
+            # 이미 삭제된 본인 댓글이면 그대로 204
+            writer_id = CommentInfo.objects.filter(pk=comment_id).values_list("userinfo_id", flat=True).first()
+            if writer_id is None:
+                raise Http404("No CommentInfo matches the given query.")
+            if request.user.id != writer_id:
+                return Response(status=status.HTTP_403_FORBIDDEN)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 # FBV로 구현
+# 즐겨찾기/좋아요 토글: 중간 테이블(through)에 바로 get_or_create 해서
+# 글 조회 + exists() 확인 없이 처리. 없는 글/댓글이면 FK 제약 위반(IntegrityError) -> 404
 
 @api_view(["POST"])
+@permission_classes([IsAuthenticated]) # 비로그인 요청은 뷰 실행 전에 DRF가 차단
 def content_favorite(request, content_id):
-    if request.user.is_authenticated: # 한결 튜터님 피드백: 데코레이터로.. 해진님은 에러가 계속 발생해서 이렇게 처리하셨다고
-        me = get_user_model().objects.get(id=request.user.id)
-        content = get_object_or_404(ContentInfo, id=content_id)
-
-        if me.favorite_contents.filter(id=content_id).exists():
-            me.favorite_contents.remove(content)
-            return Response(
-                data={
-                    "message": "Favorite content canceled.",
-                },
-                status=status.HTTP_200_OK
+    FavoriteThrough = ContentInfo.favorite_by.through
+    try:
+        with transaction.atomic():
+            favorite, created = FavoriteThrough.objects.get_or_create(
+                userinfo_id=request.user.id, contentinfo_id=content_id
             )
-        else:
-            me.favorite_contents.add(content)
-            return Response(
-                data={
-                    "message": "Favorite content success.",
-                    "user": me.username,
-                    "content_id": content.id,
-                },
-                status=status.HTTP_200_OK
-            )
-    else:
-        return Response(status=status.HTTP_403_FORBIDDEN)
+            if not created:
+                favorite.delete()
+    except IntegrityError:
+        raise Http404("No ContentInfo matches the given query.")
+
+    if not created:
+        return Response(
+            data={
+                "message": "Favorite content canceled.",
+            },
+            status=status.HTTP_200_OK
+        )
+    return Response(
+        data={
+            "message": "Favorite content success.",
+            "user": request.user.username,
+            "content_id": content_id,
+        },
+        status=status.HTTP_200_OK
+    )
 
 
 @api_view(["POST"])
+@permission_classes([IsAuthenticated])
 def content_like(request, content_id):
-    if request.user.is_authenticated:
-        me = get_user_model().objects.get(id=request.user.id)
-        content = get_object_or_404(ContentInfo, id=content_id)
-
-        if me.liked_contents.filter(id=content_id).exists():
-            me.liked_contents.remove(content)
-            return Response(
-                data={
-                    "message": "Like content canceled.",
-                },
-                status=status.HTTP_200_OK
+    LikeThrough = ContentInfo.liked_by.through
+    try:
+        with transaction.atomic():
+            like, created = LikeThrough.objects.get_or_create(
+                userinfo_id=request.user.id, contentinfo_id=content_id
             )
-        else:
-            me.liked_contents.add(content)
-            return Response(
-                data={
-                    "message": "Like content success.",
-                    "user": me.username,
-                    "content_id": content.id,
-                },
-                status=status.HTTP_200_OK
-            )
-    else:
-        return Response(status=status.HTTP_403_FORBIDDEN)
+            # 좋아요 하나당 +1 Point
+            # 취소는 실제로 지운 경우에만 -1 (다른 요청이 먼저 지웠으면 0개 -> 카운터 그대로)
+            point = 1 if created else -like.delete()[0]
+            if point:
+                ContentInfo.objects.filter(pk=content_id).update(
+                    like_count=F("like_count") + point,
+                    article_point=F("article_point") + point,
+                )
+    except IntegrityError:
+        raise Http404("No ContentInfo matches the given query.")
+
+    if not created:
+        return Response(
+            data={
+                "message": "Like content canceled.",
+            },
+            status=status.HTTP_200_OK
+        )
+    return Response(
+        data={
+            "message": "Like content success.",
+            "user": request.user.username,
+            "content_id": content_id,
+        },
+        status=status.HTTP_200_OK
+    )
 
 
 @api_view(["POST"])
+@permission_classes([IsAuthenticated])
 def comment_like(request, comment_id):
-    if request.user.is_authenticated:
-        me = get_user_model().objects.get(id=request.user.id)
-        comment = get_object_or_404(CommentInfo, id=comment_id)
-
-        if me.liked_comments.filter(id=comment_id).exists():
-            me.liked_comments.remove(comment)
-            return Response(
-                data={
-                    "message": "Like comment canceled.",
-                },
-                status=status.HTTP_200_OK
-            )
-        else:
-            me.liked_comments.add(comment)
-            return Response(
-                data={
-                    "message": "Like comment success.",
-                    "user": me.username,
-                    "content_id": comment.id,
-                },
-                status=status.HTTP_200_OK
+    LikeThrough = CommentInfo.liked_by.through
+    try:
+        with transaction.atomic():
+            like, created = LikeThrough.objects.get_or_create(
+                userinfo_id=request.user.id, commentinfo_id=comment_id
             )
+            if not created:
+                like.delete()
+    except IntegrityError:
+        raise Http404("No CommentInfo matches the given query.")
+
+    if not created:
+        return Response(
+            data={
+                "message": "Like comment canceled.",
+            },
+            status=status.HTTP_200_OK
+        )
+    return Response(
+        data={
+            "message": "Like comment success.",
+            "user": request.user.username,
+            "content_id": comment_id,
+        },
+        status=status.HTTP_200_OK
+    )
+
+
+# 여러 개를 한 번에 토글 (요청 한 번, 트랜잭션 한 번)
+# body: {"content_ids": [1, 2, 3]} 또는 {"comment_ids": [1, 2, 3]}, id 배열만 보내도 됨 ([1, 2, 3])
+# 이미 즐겨찾기/좋아요 한 것은 취소, 안 한 것은 등록. 없는 글/댓글 id는 무시
+
+MAX_BULK_IDS = 100
+
+
+def id_list_data(request, key):
+    data = request.data
+    if isinstance(data, list):
+        ids = data
+    elif isinstance(data, dict):
+        ids = data.get(key)
     else:
-        return Response(status=status.HTTP_403_FORBIDDEN)
+        ids = None
+    if (
+        not isinstance(ids, list)
+        or not 0 < len(ids) <= MAX_BULK_IDS
+        or not all(isinstance(i, int) and not isinstance(i, bool) for i in ids)
+    ):
+        raise ValidationError({key: f"A list of 1 to {MAX_BULK_IDS} ids is required."})
+    return list(dict.fromkeys(ids)) # 중복 제거 (순서 유지)
+
+
+def toggle_many(user_id, Through, target_field, targets):
+    # targets: 토글할 대상(글/댓글) queryset. (등록된 id 목록, 취소된 id 목록) 반환
+    ids = list(targets.values_list("pk", flat=True))
+    rows = Through.objects.filter(userinfo_id=user_id, **{f"{target_field}__in": ids})
+    removed = list(rows.values_list(target_field, flat=True))
+    already = set(removed)
+    added = [i for i in ids if i not in already]
+
+    # 읽은 뒤에 다른 요청이 같은 row를 먼저 지웠으면 지운 개수가 removed보다 적음
+    # -> 그대로 두면 removed 개수만큼 카운터가 또 내려가므로 409로 실패 처리
+    if rows.delete()[0] != len(removed):
+        raise ToggleConflictException()
+    # 읽은 뒤에 다른 요청이 같은 row를 먼저 넣었거나 대상이 지워졌으면 IntegrityError
+    # -> 충돌을 무시하면 added에 넣지 않은 id가 남아 카운터가 두 번 올라가므로 409로 실패 처리
+    # (뷰의 transaction.atomic 밖으로 예외가 나가면서 delete/카운터 변경도 모두 rollback)
+    try:
+        Through.objects.bulk_create(
+            [Through(userinfo_id=user_id, **{target_field: i}) for i in added]
+        )
+    except IntegrityError:
+        raise ToggleConflictException()
+    return added, removed
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def content_favorite_bulk(request):
+    ids = id_list_data(request, "content_ids")
+    with transaction.atomic():
+        added, removed = toggle_many(
+            request.user.id, ContentInfo.favorite_by.through, "contentinfo_id",
+            ContentInfo.objects.filter(pk__in=ids),
+        )
+    return Response(
+        data={
+            "message": "Favorite contents toggled.",
+            "user": request.user.username,
+            "added": added,
+            "removed": removed,
+        },
+        status=status.HTTP_200_OK
+    )
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def content_like_bulk(request):
+    ids = id_list_data(request, "content_ids")
+    with transaction.atomic():
+        added, removed = toggle_many(
+            request.user.id, ContentInfo.liked_by.through, "contentinfo_id",
+            ContentInfo.objects.filter(pk__in=ids),
+        )
+        # 좋아요 하나당 +1 Point
+        ContentInfo.objects.filter(pk__in=added).update(
+            like_count=F("like_count") + 1,
+            article_point=F("article_point") + 1,
+        )
+        ContentInfo.objects.filter(pk__in=removed).update(
+            like_count=F("like_count") - 1,
+            article_point=F("article_point") - 1,
+        )
+    return Response(
+        data={
+            "message": "Like contents toggled.",
+            "user": request.user.username,
+            "added": added,
+            "removed": removed,
+        },
+        status=status.HTTP_200_OK
+    )
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def comment_like_bulk(request):
+    ids = id_list_data(request, "comment_ids")
+    with transaction.atomic():
+        added, removed = toggle_many(
+            request.user.id, CommentInfo.liked_by.through, "commentinfo_id",
+            CommentInfo.objects.filter(pk__in=ids),
+        )
+    return Response(
+        data={
+            "message": "Like comments toggled.",
+            "user": request.user.username,
+            "added": added,
+            "removed": removed,
+        },
+        status=status.HTTP_200_OK
+    )
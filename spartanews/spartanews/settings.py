@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import sys
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -90,6 +91,11 @@ DATABASES = {
     }
 }
 
+# 이 저장소는 migration 파일을 커밋하지 않음 (각자 makemigrations 후 migrate)
+# -> manage.py test 는 migration 없이 모델에서 바로 테이블을 만들어서 실행
+if sys.argv[1:2] == ["test"]:
+    MIGRATION_MODULES = {"accounts": None, "articles": None}
+
 # Auth User Model - Custom
 AUTH_USER_MODEL = 'accounts.UserInfo'
 